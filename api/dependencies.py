@@ -0,0 +1,22 @@
+from fastapi import Request
+
+from services.chat_completion.chat_service import ChatService
+from services.file_pipeline.cosmos_service import CosmosService
+from services.file_pipeline.file_service import FileService
+from services.file_pipeline.vector_store_service import VectoreStoreService
+
+
+def get_cosmos_service(request: Request) -> CosmosService:
+    return request.app.state.cosmos_service
+
+
+def get_file_service(request: Request) -> FileService:
+    return request.app.state.file_service
+
+
+def get_vector_store_service(request: Request) -> VectoreStoreService:
+    return request.app.state.vector_store_service
+
+
+def get_chat_service(request: Request) -> ChatService:
+    return request.app.state.chat_service
@@ -1,9 +1,9 @@
+from typing import Tuple
+
 from fastapi import Request
 from fastapi.exception_handlers import RequestValidationError
 from fastapi.responses import JSONResponse
 
-from models.models import ErrorResponse
-
 
 class FileValidationError(Exception):
     """Raised when file validation fails."""
@@ -34,8 +34,8 @@ class ChatCompletionError(Exception):
     pass
 
 
-class FileNotFoundError(Exception):
-    """Raised when file not found."""
+class StoredFileNotFoundError(Exception):
+    """Raised when a file is not found in the metadata store."""
 
     pass
 
@@ -52,86 +52,47 @@ class AuthorizationError(Exception):
     pass
 
 
+# Maps each application exception to its HTTP status and error code
+EXCEPTION_MAP = {
+    FileValidationError: (422, "FILE_VALIDATION_ERROR"),
+    FileProcessingError: (500, "FILE_PROCESSING_ERROR"),
+    DatabaseError: (500, "DATABASE_ERROR"),
+    SearchIndexingError: (500, "SEARCH_INDEXING_ERROR"),
+    ChatCompletionError: (500, "CHAT_COMPLETION_ERROR"),
+    StoredFileNotFoundError: (404, "FILE_NOT_FOUND"),
+    AuthenticationError: (401, "AUTHENTICATION_ERROR"),
+    AuthorizationError: (401, "AUTHORIZATION_ERROR"),
+}
+DEFAULT_ERROR = (500, "INTERNAL_SERVER_ERROR")
+
+
+def build_response(status_code: int, code: str, message: str) -> JSONResponse:
+    return JSONResponse(
+        status_code=status_code,
+        content={"status": "error", "code": code, "message": message},
+    )
+
+
+def resolve_error(exc: BaseException) -> Tuple[int, str]:
+    """Return the HTTP status and error code mapped to an exception."""
+    for exc_type in type(exc).__mro__:
+        if exc_type in EXCEPTION_MAP:
+            return EXCEPTION_MAP[exc_type]
+    return DEFAULT_ERROR
+
+
+async def app_exception_handler(request: Request, exc: Exception):
+    status_code, code = resolve_error(exc)
+    return build_response(status_code, code, str(exc))
+
+
+async def validation_exception_handler(request: Request, exc: RequestValidationError):
+    messages = "; ".join([f"{err['loc'][-1]}: {err['msg']}" for err in exc.errors()])
+    return build_response(422, "VALIDATION_ERROR", messages)
+
+
 def register_exception_handlers(app):
-    def build_response(
-        exc: Exception, code: str, status: str = "error", message: str = None
-    ):
-        return ErrorResponse(
-            status=status, code=code, message=message or str(exc)
-        ).model_dump()
-
-    @app.exception_handler(FileValidationError)
-    async def file_validation_exception_handler(
-        request: Request, exc: FileValidationError
-    ):
-        return JSONResponse(
-            status_code=422, content=build_response(exc, code="FILE_VALIDATION_ERROR")
-        )
-
-    @app.exception_handler(FileProcessingError)
-    async def file_processing_exception_handler(
-        request: Request, exc: FileProcessingError
-    ):
-        return JSONResponse(
-            status_code=500, content=build_response(exc, code="FILE_PROCESSING_ERROR")
-        )
-
-    @app.exception_handler(DatabaseError)
-    async def database_exception_handler(request: Request, exc: DatabaseError):
-        return JSONResponse(
-            status_code=500, content=build_response(exc, code="DATABASE_ERROR")
-        )
-
-    @app.exception_handler(SearchIndexingError)
-    async def search_exception_handler(request: Request, exc: SearchIndexingError):
-        return JSONResponse(
-            status_code=500, content=build_response(exc, code="SEARCH_INDEXING_ERROR")
-        )
-    
-    @app.exception_handler(ChatCompletionError)
-    async def chat_exception_handler(request: Request, exc: ChatCompletionError):
-        return JSONResponse(
-            status_code=500, content=build_response(exc, code="CHAT_COMPLETION_ERROR")
-        )
-
-    @app.exception_handler(FileNotFoundError)
-    async def file_not_found_handler(request: Request, exc: FileNotFoundError):
-        return JSONResponse(
-            status_code=404, content=build_response(exc, code="FILE_NOT_FOUND")
-        )
-
-    @app.exception_handler(Exception)
-    async def generic_exception_handler(request: Request, exc: Exception):
-        return JSONResponse(
-            status_code=500, content=build_response(exc, code="INTERNAL_SERVER_ERROR")
-        )
-
-    @app.exception_handler(RequestValidationError)
-    async def validation_exception_handler(
-        request: Request, exc: RequestValidationError
-    ):
-        messages = "; ".join(
-            [f"{err['loc'][-1]}: {err['msg']}" for err in exc.errors()]
-        )
-        return JSONResponse(
-            status_code=422,
-            content=build_response(exc, code="VALIDATION_ERROR", message=messages),
-        )
-
-    @app.exception_handler(AuthenticationError)
-    async def authentication_exception_handler(
-        request: Request, exc: AuthenticationError
-    ):
-        return JSONResponse(
-            status_code=401,
-            content=build_response(exc, code="AUTHENTICATION_ERROR"),
-        )
-
-    @app.exception_handler(AuthorizationError)
-    async def authorization_exception_handler(
-        request: Request, exc: AuthorizationError
-    ):
-        return JSONResponse(
-            status_code=401,
-            content=build_response(exc, code="AUTHORIZATION_ERROR"),
-        )
+    for exc_type in EXCEPTION_MAP:
+        app.add_exception_handler(exc_type, app_exception_handler)
+    app.add_exception_handler(Exception, app_exception_handler)
+    app.add_exception_handler(RequestValidationError, validation_exception_handler)
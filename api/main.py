@@ -1,11 +1,69 @@
+from contextlib import asynccontextmanager
+
+import httpx
 from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
 
 from api.exceptions import register_exception_handlers
+from api.middleware import FastPathMiddleware
 from api.routes.auth_routes import router as auth_router
 from api.routes.file_routes import router as file_router
 from api.routes.chat_routes import router as chat_router
+from services.chat_completion.chat_service import ChatService
+from services.credential import get_async_credential, get_credential
+from services.file_pipeline.cosmos_service import CosmosService
+from services.file_pipeline.file_service import FileService
+from services.file_pipeline.vector_store_service import VectoreStoreService
+from services.file_reader.parsers import shutdown_pdf_executor
+from settings import settings
+
+
+# Connection pool shared by every Azure OpenAI client in the process. HTTP/2
+# multiplexes concurrent embedding and chat calls over fewer connections
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=100)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the Azure-backed services once and share them across requests
+    http_client = httpx.Client(limits=HTTP_LIMITS, http2=True)
+    http_async_client = httpx.AsyncClient(limits=HTTP_LIMITS, http2=True)
+    http_clients = {"http_client": http_client, "http_async_client": http_async_client}
+
+    app.state.cosmos_service = CosmosService()
+    app.state.vector_store_service = VectoreStoreService(**http_clients)
+    # FileService reuses the same clients instead of opening its own
+    app.state.file_service = FileService(
+        cosmos=app.state.cosmos_service, vector=app.state.vector_store_service
+    )
+    app.state.chat_service = ChatService(**http_clients)
+    yield
+    await app.state.vector_store_service.close()
+    await app.state.cosmos_service.close()
+    await get_async_credential().close()
+    get_credential().close()
+    http_client.close()
+    await http_async_client.aclose()
+    shutdown_pdf_executor()
+
+
+app = FastAPI(
+    title="File Ingestion API",
+    lifespan=lifespan,
+)
+
+# Answer health checks before routing
+app.add_middleware(FastPathMiddleware)
 
-app = FastAPI(title="File Ingestion API")
+# Exact origins are a set lookup, wildcard deployments (e.g. Static Web App
+# preview environments) go through one precompiled regex instead
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=frozenset(settings.cors_allow_origins),
+    allow_origin_regex=settings.cors_allow_origin_regex,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
 
 # Register centralized exception handlers
 register_exception_handlers(app)
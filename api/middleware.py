@@ -0,0 +1,38 @@
+import orjson
+
+HEALTH_PATH = "/healthz"
+HEALTH_BODY = orjson.dumps({"ok": True})
+
+
+class FastPathMiddleware:
+    """
+    Pure ASGI middleware that answers health checks before routing,
+    dependency resolution and exception handling run. Every other request,
+    including OPTIONS, goes through the app so CORS preflights and unknown
+    paths get their proper responses.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if scope["path"] == HEALTH_PATH and scope["method"] in ("GET", "HEAD"):
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 200,
+                    "headers": [
+                        (b"content-type", b"application/json"),
+                        (b"content-length", str(len(HEALTH_BODY)).encode()),
+                    ],
+                }
+            )
+            body = HEALTH_BODY if scope["method"] == "GET" else b""
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        await self.app(scope, receive, send)
@@ -1,5 +1,7 @@
 from fastapi import APIRouter, HTTPException, Depends, status
+from starlette.responses import StreamingResponse
 
+from api.dependencies import get_chat_service, get_vector_store_service
 from models.models import ChatRequest, ChatResponse, ErrorResponse
 from services.auth_service import AuthService
 from services.chat_completion.chat_service import ChatService
@@ -7,16 +9,15 @@ from services.file_pipeline.vector_store_service import VectoreStoreService
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
-
-chat_service = ChatService()
 auth_service = AuthService()
-vector_store_service = VectoreStoreService()
 
 
-@router.post("/", response_model=ChatResponse)
+@router.post("/", response_model=ChatResponse, deprecated=True)
 async def chat_completion(
     request: ChatRequest,
     username: str = Depends(auth_service.verify_token),
+    chat_service: ChatService = Depends(get_chat_service),
+    vector_store_service: VectoreStoreService = Depends(get_vector_store_service),
 ) -> ChatResponse:
     """
     Generate a chat response with optional vector store context.
@@ -25,15 +26,55 @@ async def chat_completion(
     - **chat_history**: Previous conversation messages (optional). Should be a list of dicts in the format {"role": "", "content": ""}, where role is either 'user' or 'assistant'.
     
     Returns enriched AI response with context information.
+
+    Deprecated: use /chat/stream, which sends the reply as it is generated.
     """
 
-    retrieved_context = vector_store_service.similarity_search(
-        query=request.question)
-    
-    result = chat_service.chat_with_context(
-            question=request.question,
-            chat_history=request.chat_history,
-            context_docs=retrieved_context
-        )
-    
-    return ChatResponse(**result)
\ No newline at end of file
+    # Validate the question before paying for the search
+    prompt_inputs = chat_service.prepare_prompt(
+        question=request.question, chat_history=request.chat_history
+    )
+    retrieved_context = await vector_store_service.similarity_search(
+        query=request.question
+    )
+
+    result = await chat_service.chat_with_context(
+        prompt_inputs=prompt_inputs, context_docs=retrieved_context
+    )
+
+    # response_model already validates the outbound payload once
+    return ChatResponse.model_construct(**result)
+
+
+@router.post("/stream", response_class=StreamingResponse)
+async def chat_completion_stream(
+    request: ChatRequest,
+    username: str = Depends(auth_service.verify_token),
+    chat_service: ChatService = Depends(get_chat_service),
+    vector_store_service: VectoreStoreService = Depends(get_vector_store_service),
+) -> StreamingResponse:
+    """
+    Stream a chat response with optional vector store context as Server-Sent Events.
+
+    - **question**: The user's question or message
+    - **chat_history**: Previous conversation messages (optional). Should be a list of dicts in the format {"role": "", "content": ""}, where role is either 'user' or 'assistant'.
+
+    Each `data` event carries a `delta` with the next fragment of the reply. The
+    stream ends with a `done` event holding the timestamp, or an `error` event.
+    """
+
+    # Validation and retrieval fail fast with a regular error response
+    prompt_inputs = chat_service.prepare_prompt(
+        question=request.question, chat_history=request.chat_history
+    )
+    retrieved_context = await vector_store_service.similarity_search(
+        query=request.question
+    )
+
+    return StreamingResponse(
+        chat_service.chat_with_context_stream(
+            prompt_inputs=prompt_inputs, context_docs=retrieved_context
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
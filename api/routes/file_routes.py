@@ -1,6 +1,9 @@
-from fastapi import APIRouter, Depends, Path, UploadFile
+from typing import List, Optional
 
-from api.exceptions import FileValidationError
+from fastapi import APIRouter, Depends, Path, Query, UploadFile
+
+from api.dependencies import get_cosmos_service, get_file_service
+from api.exceptions import resolve_error
 from models.models import (
     DeleteFileResponse,
     ErrorResponse,
@@ -8,16 +11,16 @@ from models.models import (
     GetFileResponse,
     ListFilesResponse,
     UploadFileResponse,
+    UploadFileResult,
+    UploadFilesResponse,
 )
 from services.auth_service import AuthService
 from services.file_pipeline.cosmos_service import CosmosService
-from services.file_pipeline.file_validator import validate_file
+from services.file_pipeline.file_validator import validate_file, validate_files
 from services.file_pipeline.file_service import FileService
 from services.file_reader.file_reader import FileReader
 
 router = APIRouter()
-file_service = FileService()
-cosmos_service = CosmosService()
 file_reader = FileReader()
 auth_service = AuthService()
 
@@ -34,24 +37,81 @@ auth_service = AuthService()
 async def upload_file(
     file: UploadFile = Depends(validate_file),
     username: str = Depends(auth_service.verify_token),
+    file_service: FileService = Depends(get_file_service),
 ):
-    if not (file.filename.endswith((".txt", ".pdf", ".docx"))):
-        raise FileValidationError("Only .txt, .docx and .pdf files are supported")
+    content = file_reader.iter_text(file)
+
+    result = await file_service.process_file(file.filename, content)
+    return UploadFileResponse.model_construct(**result)
 
-    content = file_reader.read_file(file)
 
-    result = file_service.process_file(file.filename, content)
-    return UploadFileResponse(**result)
+@router.post(
+    "/upload-files",
+    response_model=UploadFilesResponse,
+    responses={
+        401: {"model": ErrorResponse},
+        422: {"model": ErrorResponse},
+    },
+)
+async def upload_files(
+    files: List[UploadFile] = Depends(validate_files),
+    username: str = Depends(auth_service.verify_token),
+    file_service: FileService = Depends(get_file_service),
+):
+    results = await file_service.process_files(
+        [(file.filename, file_reader.iter_text(file)) for file in files]
+    )
+
+    # Files succeed or fail independently, report each outcome
+    upload_results = []
+    for file, result in zip(files, results):
+        if isinstance(result, BaseException):
+            # Cancellation and other non-errors abort the whole request
+            if not isinstance(result, Exception):
+                raise result
+            _, code = resolve_error(result)
+            upload_results.append(
+                UploadFileResult.model_construct(
+                    filename=file.filename,
+                    file_id=None,
+                    chunks_indexed=None,
+                    error=ErrorResponse.model_construct(
+                        status="error", code=code, message=str(result)
+                    ),
+                )
+            )
+        else:
+            upload_results.append(
+                UploadFileResult.model_construct(
+                    filename=file.filename, error=None, **result
+                )
+            )
+    return UploadFilesResponse.model_construct(results=upload_results)
 
 
 @router.get(
     "/files",
     response_model=ListFilesResponse,
-    responses={401: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
+    responses={
+        401: {"model": ErrorResponse},
+        422: {"model": ErrorResponse},
+        500: {"model": ErrorResponse},
+    },
 )
-async def list_files(username: str = Depends(auth_service.verify_token)):
-    files = cosmos_service.list_files()
-    return ListFilesResponse(files=files)
+async def list_files(
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of files to return"),
+    continuation: Optional[str] = Query(
+        None, description="continuation_token of the previous page"
+    ),
+    username: str = Depends(auth_service.verify_token),
+    cosmos_service: CosmosService = Depends(get_cosmos_service),
+):
+    files, continuation_token = await cosmos_service.list_files(
+        max_item_count=limit, continuation=continuation
+    )
+    return ListFilesResponse.model_construct(
+        files=files, continuation_token=continuation_token
+    )
 
 
 @router.get(
@@ -67,10 +127,12 @@ async def list_files(username: str = Depends(auth_service.verify_token)):
 async def get_file(
     file_id: str = Path(..., description="The ID of the file to retrieve"),
     username: str = Depends(auth_service.verify_token),
+    cosmos_service: CosmosService = Depends(get_cosmos_service),
 ):
-    file_item = cosmos_service.get_file(file_id)
-    return GetFileResponse(
-        file=FileMetadata(
+    file_item = await cosmos_service.get_file(file_id)
+    # Items come from our own container, skip re-validating them
+    return GetFileResponse.model_construct(
+        file=FileMetadata.model_construct(
             id=file_item["id"],
             filename=file_item["filename"],
             created_at=file_item["created_at"],
@@ -91,6 +153,7 @@ async def get_file(
 async def delete_file(
     file_id: str = Path(..., description="The ID of the file to delete"),
     username: str = Depends(auth_service.verify_token),
+    file_service: FileService = Depends(get_file_service),
 ):
-    success = file_service.delete_file(file_id)
-    return DeleteFileResponse(file_id=file_id, deleted=success)
+    success = await file_service.delete_file(file_id)
+    return DeleteFileResponse.model_construct(file_id=file_id, deleted=success)
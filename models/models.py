@@ -1,9 +1,11 @@
 from typing import ClassVar, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class FileMetadata(BaseModel):
+    # Built with model_construct on the read path, so make instances immutable
+    model_config = ConfigDict(frozen=True, extra="forbid")
     # Constants (not model fields)
     ID: ClassVar[str] = "id"
     FILENAME: ClassVar[str] = "filename"
@@ -23,6 +25,7 @@ class ChunkMetadata(BaseModel):
 
 
 class ChunkedEmbedding(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
     chunk_text: str = Field(..., description="Text of the chunk")
     vector: List[float] = Field(..., description="Embedding vector for the chunk")
 
@@ -48,12 +51,34 @@ class UploadFileResponse(BaseModel):
     )
 
 
+class UploadFileResult(BaseModel):
+    filename: str = Field(..., description="Original filename")
+    file_id: Optional[str] = Field(
+        None, description="Unique ID assigned to the file, null if it failed"
+    )
+    chunks_indexed: Optional[int] = Field(
+        None, description="Number of text chunks that were indexed, null if it failed"
+    )
+    error: Optional[ErrorResponse] = Field(
+        None, description="Why the file failed, null if it was indexed"
+    )
+
+
+class UploadFilesResponse(BaseModel):
+    results: List[UploadFileResult] = Field(
+        ..., description="Outcome of each uploaded file, in upload order"
+    )
+
+
 class GetFileResponse(BaseModel):
     file: FileMetadata = Field(..., description="Metadata of the requested file")
 
 
 class ListFilesResponse(BaseModel):
     files: List[FileMetadata] = Field(..., description="List of stored files")
+    continuation_token: Optional[str] = Field(
+        None, description="Token to pass as `continuation` to get the next page, null on the last page"
+    )
 
 
 class DeleteFileResponse(BaseModel):
@@ -1,9 +1,13 @@
+import hashlib
+import hmac
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
+from cachetools import TLRUCache
 from fastapi import Depends
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
+from jose import JWTError, jwk, jwt
 from jose.exceptions import ExpiredSignatureError
 
 from api.exceptions import AuthenticationError, AuthorizationError
@@ -11,6 +15,22 @@ from settings import settings
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
 
+TOKEN_CACHE_SIZE = 4096
+
+
+def _token_expiry(key: bytes, value: tuple, now: float) -> float:
+    """
+    Expiry time of a cached token: its exp claim, capped at
+    auth_token_cache_ttl_seconds.
+    """
+    return min(value[1], now + settings.auth_token_cache_ttl_seconds)
+
+
+# Shared by every AuthService instance, so a token verified through one
+# router is a cache hit on the others. Keyed by a hash of the token, the
+# raw token is never stored
+_token_cache = TLRUCache(maxsize=TOKEN_CACHE_SIZE, ttu=_token_expiry, timer=time.time)
+
 
 class AuthService:
     """
@@ -24,6 +44,12 @@ class AuthService:
         self.access_token_expire_minutes = settings.access_token_expire_minutes
         self.username = settings.username
         self.password = settings.password
+        # Pre-encoded for the constant-time comparison in validate_user
+        self._username_bytes = self.username.encode()
+        self._password_bytes = self.password.encode()
+        # Parse the signing key once instead of on every encode/decode
+        self._signing_key = jwk.construct(self.secret_key, self.algorithm)
+        self._algorithms = [self.algorithm]
 
     def create_access_token(
         self, data: dict, expires_delta: Optional[timedelta] = None
@@ -43,7 +69,7 @@ class AuthService:
             expires_delta or timedelta(minutes=self.access_token_expire_minutes)
         )
         to_encode.update({"exp": expire})
-        return jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
+        return jwt.encode(to_encode, self._signing_key, algorithm=self.algorithm)
 
     def validate_user(self, username: str, password: str) -> None:
         """
@@ -56,7 +82,12 @@ class AuthService:
         Raises:
             AuthenticationError: If username/password are incorrect.
         """
-        if username != self.username or password != self.password:
+        # Compare both fields without short-circuiting so the response time
+        # doesn't reveal which one was wrong
+        ok = hmac.compare_digest(
+            username.encode(), self._username_bytes
+        ) & hmac.compare_digest(password.encode(), self._password_bytes)
+        if not ok:
             raise AuthenticationError("Invalid username or password")
 
     async def verify_token(self, token: str = Depends(oauth2_scheme)) -> str:
@@ -75,13 +106,26 @@ class AuthService:
         if not token:
             raise AuthorizationError("Missing bearer token")
 
+        # A TTL of 0 disables the cache
+        use_cache = settings.auth_token_cache_ttl_seconds > 0
+        if use_cache:
+            cache_key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+            # Entries are evicted once the token expires, a hit is still valid
+            cached = _token_cache.get(cache_key)
+            if cached is not None:
+                return cached[0]
+
         try:
-            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+            payload = jwt.decode(token, self._signing_key, algorithms=self._algorithms)
             username: str = payload.get("sub")
             if username is None or username != self.username:
                 raise AuthorizationError("Invalid authentication credentials")
-            return username
         except ExpiredSignatureError:
             raise AuthorizationError("Token has expired")
         except JWTError as e:
             raise AuthorizationError(f"Token validation error: {str(e)}")
+
+        # Only tokens that passed validation are cached
+        if use_cache:
+            _token_cache[cache_key] = (username, payload.get("exp", 0))
+        return username
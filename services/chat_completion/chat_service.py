@@ -1,10 +1,13 @@
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, AsyncIterator, Optional
 from datetime import datetime
 from typing import Tuple
 
 
-from azure.identity import DefaultAzureCredential
+import httpx
+import openai
+import orjson
+from azure.core.exceptions import AzureError
 from langchain_openai import AzureChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder, HumanMessagePromptTemplate
@@ -13,6 +16,7 @@ from langchain_core.runnables import RunnablePassthrough
 from langchain_core.documents import Document
 
 from models.models import ChatMessage
+from services.credential import get_async_token_provider, get_token_provider
 from settings import settings
 from api.exceptions import ChatCompletionError
 
@@ -27,32 +31,46 @@ class ChatService:
     - Proper error handling and logging
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        http_client: Optional[httpx.Client] = None,
+        http_async_client: Optional[httpx.AsyncClient] = None,
+    ):
         """
         Initialize the ChatService with Azure OpenAI and vector store.
+
+        Args:
+            http_client (httpx.Client, optional): Shared client for sync Azure OpenAI calls.
+            http_async_client (httpx.AsyncClient, optional): Shared client for async Azure OpenAI calls.
         
         Raises:
             ChatCompletionError: If initialization fails.
         """
         try:
-            # Use managed identity for secure authentication
-            credential = DefaultAzureCredential()
-            
             # Initialize Azure OpenAI chat model
             self.llm = AzureChatOpenAI(
                 azure_endpoint=settings.azure_openai_endpoint,
                 azure_deployment=settings.azure_openai_chat_deployment,
                 api_version=settings.azure_openai_chat_api_version,
-                azure_ad_token_provider=lambda: credential.get_token(
-                    "https://cognitiveservices.azure.com/.default"
-                ).token,
+                # Shared, cached tokens from the process-wide credential
+                azure_ad_token_provider=get_token_provider(),
+                azure_ad_async_token_provider=get_async_token_provider(),
                 max_completion_tokens=1000,  # Reasonable response length
-                streaming=False,  # Disable streaming for simplicity
+                # The SDK retries 429s and transient errors with jittered backoff
+                max_retries=settings.azure_openai_max_retries,
+                # ainvoke fetches the reply in one response, astream (used by
+                # chat_with_context_stream) always requests stream=True
+                streaming=False,
+                http_client=http_client,
+                http_async_client=http_async_client,
             )
             
+            # The system prompt never changes, build its message once
+            self._system_message = SystemMessage(content=self._get_system_prompt())
+
             # Create the chat prompt template
             self.prompt_template = ChatPromptTemplate.from_messages([
-                SystemMessage(content=self._get_system_prompt()),
+                self._system_message,
                 MessagesPlaceholder(variable_name="context"),
                 MessagesPlaceholder(variable_name="chat_history"),
                 HumanMessagePromptTemplate.from_template("{question}")
@@ -72,44 +90,60 @@ class ChatService:
         except Exception as e:
             raise ChatCompletionError(f"Chat service initialization failed: {str(e)}")
     
-    def chat_with_context(
+    def prepare_prompt(
         self,
         question: str,
         chat_history: Optional[List[ChatMessage]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Prepare the prompt inputs that do not depend on the retrieved context.
+        Call it before searching, so an invalid question fails without a
+        search round-trip.
+
+        Args:
+            question (str): The user's question/message
+            chat_history (List[ChatMessage], optional): Previous chat messages
+
+        Returns:
+            Dict containing the question and the formatted chat history.
+
+        Raises:
+            ValueError: If question is empty
+        """
+        if not question or not question.strip():
+            raise ValueError("Question cannot be empty")
+
+        return {
+            "question": question,
+            "chat_history": self._format_chat_history(chat_history or []),
+        }
+
+    async def chat_with_context(
+        self,
+        prompt_inputs: Dict[str, Any],
         context_docs: List[Tuple[Document, float]] = []
     ) -> Dict[str, Any]:
         """
-        Generate a chat response using question + vector store context.
+        Generate a chat response using the prepared prompt + vector store context.
         
         Args:
-            question (str): The user's question/message
-            chat_history (List[Dict], optional): Previous chat messages
-            top_k (int): Number of context documents to retrieve
-            similarity_threshold (float): Minimum similarity score for context
-            file_id_filter (str, optional): Filter context to specific file
+            prompt_inputs (Dict[str, Any]): Output of prepare_prompt
+            context_docs (List[Tuple[Document, float]]): Retrieved documents and their scores
             
         Returns:
             Dict containing:
                 - response (str): AI-generated response
-                - context_used (List[Dict]): Context documents that informed the response
                 - timestamp (str): ISO timestamp of the response
                 
         Raises:
-            ValueError: If question is empty
-            ChatCompletionError: If context retrieval fails
+            ChatCompletionError: If the completion fails
         """
-        if not question or not question.strip():
-            raise ValueError("Question cannot be empty")
-            
         try:
-            # Format chat history for the prompt
-            formatted_history = self._format_chat_history(chat_history or [])
-
-            # For the chain, pass the list of (Document, score) tuples
-            response = self.chain.invoke({
-                "question": question,
+            # For the chain, pass the list of (Document, score) tuples. The async
+            # path goes through the shared http_async_client
+            response = await self.chain.ainvoke({
+                **prompt_inputs,
                 "context": context_docs,
-                "chat_history": formatted_history
             })
 
             result = {
@@ -118,40 +152,76 @@ class ChatService:
             }
 
             return result
+        except (openai.OpenAIError, AzureError) as e:
+            raise ChatCompletionError(f"Chat completion failed: {str(e)}") from e
+
+    async def chat_with_context_stream(
+        self,
+        prompt_inputs: Dict[str, Any],
+        context_docs: List[Tuple[Document, float]] = []
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat response as Server-Sent Events while the model generates it.
+
+        Args:
+            prompt_inputs (Dict[str, Any]): Output of prepare_prompt
+            context_docs (List[Tuple[Document, float]]): Retrieved documents and their scores
+
+        Yields:
+            str: One `data: {"delta": ...}` event per generated text fragment,
+            then a `done` event carrying the timestamp of the response. A
+            failure after the stream started is reported as an `error` event,
+            since the status code has already been sent.
+        """
+        try:
+            async for delta in self.chain.astream({
+                **prompt_inputs,
+                "context": context_docs,
+            }):
+                if delta:
+                    yield f"data: {orjson.dumps({'delta': delta}).decode()}\n\n"
         except Exception as e:
-            raise ChatCompletionError(f"Chat completion failed: {str(e)}")
+            # Anything raised here would only cut the stream, report it in-band
+            error = {"code": "CHAT_COMPLETION_ERROR", "message": f"Chat completion failed: {str(e)}"}
+            yield f"event: error\ndata: {orjson.dumps(error).decode()}\n\n"
+            return
+
+        done = {"timestamp": datetime.now().isoformat()}
+        yield f"event: done\ndata: {orjson.dumps(done).decode()}\n\n"
     
     
     def _format_context(self, context_docs: List[Tuple[Document, float]]) -> list:
         """
-        Format context documents (with scores) into a list of SystemMessage objects for the prompt.
+        Format context documents (with scores) into a single SystemMessage for the prompt.
         
         Args:
             context_docs (List[Tuple[Document, float]]): Context documents and their similarity scores
         Returns:
-            list: List of SystemMessage objects for LangChain
+            list: Empty, or one SystemMessage holding every labeled context
         """
         if not context_docs:
             return []
-        messages = []
-        for i, (doc, score) in enumerate(context_docs, 1):
-            file_id = doc.metadata.get("file_id", "unknown")
-            content = f"Context {i} (from file: {file_id}, relevance: {score:.2f}):\n{doc.page_content}"
-            messages.append(SystemMessage(content=content))
-        return messages
+        content = "\n\n".join(
+            f"Context {i} (from file: {doc.metadata.get('file_id', 'unknown')}, relevance: {score:.2f}):\n{doc.page_content}"
+            for i, (doc, score) in enumerate(context_docs, 1)
+        )
+        return [SystemMessage(content=content)]
     
     def _format_chat_history(self, chat_history: Optional[List[ChatMessage]]) -> list:
         """
         Convert chat history (List[ChatMessage]) to LangChain message format.
+
+        Only the last settings.chat_max_history_messages messages are kept, so
+        prompt size stays flat as the conversation grows (0 drops the history).
         Args:
             chat_history (Optional[List[ChatMessage]]): List of ChatMessage objects
         Returns:
             list: Formatted messages for LangChain
         """
         messages = []
-        if not chat_history:
+        if not chat_history or settings.chat_max_history_messages <= 0:
             return messages
-        for message in chat_history:
+        for message in chat_history[-settings.chat_max_history_messages:]:
             role = getattr(message, "role", "user")
             content = getattr(message, "content", "")
             if role == "user":
@@ -0,0 +1,81 @@
+import functools
+import os
+
+from azure.identity import (
+    DefaultAzureCredential,
+    EnvironmentCredential,
+    ManagedIdentityCredential,
+    get_bearer_token_provider,
+)
+from azure.identity.aio import (
+    DefaultAzureCredential as AsyncDefaultAzureCredential,
+    EnvironmentCredential as AsyncEnvironmentCredential,
+    ManagedIdentityCredential as AsyncManagedIdentityCredential,
+    get_bearer_token_provider as get_async_bearer_token_provider,
+)
+
+COGNITIVE_SERVICES_SCOPE = "https://cognitiveservices.azure.com/.default"
+
+
+def _use_environment() -> bool:
+    # A service principal configured through AZURE_CLIENT_ID/SECRET/TENANT_ID
+    return bool(os.getenv("AZURE_CLIENT_SECRET"))
+
+
+def _client_id():
+    # Set in Azure for a user-assigned managed identity or a service principal
+    return os.getenv("AZURE_CLIENT_ID")
+
+
+@functools.lru_cache(maxsize=1)
+def get_credential():
+    """
+    Sync credential shared by every service in the process, so tokens are
+    acquired and cached once.
+
+    In Azure only the configured source is used: the service principal from
+    the environment, or the managed identity when just AZURE_CLIENT_ID is
+    set. This avoids walking the whole DefaultAzureCredential chain. Locally
+    it falls back to DefaultAzureCredential so developer logins keep working.
+    """
+    if _use_environment():
+        return EnvironmentCredential()
+    client_id = _client_id()
+    if client_id:
+        return ManagedIdentityCredential(client_id=client_id)
+    return DefaultAzureCredential()
+
+
+@functools.lru_cache(maxsize=1)
+def get_async_credential():
+    """
+    Async counterpart of get_credential, for the aio Azure clients.
+    Closed by the application lifespan.
+    """
+    if _use_environment():
+        return AsyncEnvironmentCredential()
+    client_id = _client_id()
+    if client_id:
+        return AsyncManagedIdentityCredential(client_id=client_id)
+    return AsyncDefaultAzureCredential()
+
+
+@functools.lru_cache(maxsize=1)
+def get_token_provider():
+    """
+    Azure OpenAI token provider for sync calls. The token is cached and only
+    refreshed shortly before it expires, instead of asking the credential on
+    every request.
+    """
+    return get_bearer_token_provider(get_credential(), COGNITIVE_SERVICES_SCOPE)
+
+
+@functools.lru_cache(maxsize=1)
+def get_async_token_provider():
+    """
+    Async counterpart of get_token_provider, so async Azure OpenAI calls never
+    block the event loop on a token refresh.
+    """
+    return get_async_bearer_token_provider(
+        get_async_credential(), COGNITIVE_SERVICES_SCOPE
+    )
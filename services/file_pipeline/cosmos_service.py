@@ -1,20 +1,78 @@
+import base64
+import binascii
 import datetime
 import uuid
-from typing import List
+from typing import List, Optional, Tuple
 
-from azure.cosmos import CosmosClient
+import orjson
+from azure.core.exceptions import AzureError
 from azure.cosmos import exceptions as cosmos_exceptions
-from azure.identity import DefaultAzureCredential
+from azure.cosmos.aio import CosmosClient
 
-from api.exceptions import DatabaseError, FileNotFoundError
+from api.exceptions import DatabaseError, FileValidationError, StoredFileNotFoundError
 from models.models import FileMetadata
+from services.credential import get_async_credential
 from settings import settings
 
+# Only the metadata fields are projected server-side, newest files first. A
+# single-property ORDER BY is served by the default range index on created_at,
+# so it doesn't need a composite index as long as that path stays indexed.
+#
+# Pages are cut with a keyset on created_at instead of the SDK continuation
+# token, which cannot resume a cross-partition ORDER BY query. Files sharing
+# the created_at of the previous page's last file are told apart by id
+_LIST_FILES_SELECT = (
+    f"SELECT TOP @limit c.{FileMetadata.ID}, c.{FileMetadata.FILENAME}, "
+    f"c.{FileMetadata.CREATED_AT} FROM c"
+)
+_LIST_FILES_ORDER = f" ORDER BY c.{FileMetadata.CREATED_AT} DESC"
+LIST_FILES_QUERY = _LIST_FILES_SELECT + _LIST_FILES_ORDER
+LIST_FILES_AFTER_QUERY = (
+    _LIST_FILES_SELECT
+    + f" WHERE c.{FileMetadata.CREATED_AT} < @created_at"
+    + f" OR (c.{FileMetadata.CREATED_AT} = @created_at"
+    + f" AND NOT ARRAY_CONTAINS(@seen_ids, c.{FileMetadata.ID}))"
+    + _LIST_FILES_ORDER
+)
+
+
+def _encode_cursor(state: dict) -> str:
+    """
+    Encode the position of the next page as an opaque, URL-safe cursor.
+    """
+    return base64.urlsafe_b64encode(orjson.dumps(state)).decode()
+
+
+def _decode_cursor(cursor: str) -> dict:
+    """
+    Decode a cursor built by _encode_cursor.
+
+    Raises:
+        FileValidationError: If the cursor was not produced by this service.
+    """
+    try:
+        state = orjson.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, binascii.Error):
+        raise FileValidationError("Invalid continuation token") from None
+    if not (
+        isinstance(state, dict)
+        and isinstance(state.get("created_at"), str)
+        and isinstance(state.get("ids"), list)
+        and state["ids"]
+        and all(isinstance(file_id, str) for file_id in state["ids"])
+    ):
+        raise FileValidationError("Invalid continuation token")
+    return state
+
 
 class CosmosService:
     """
     Service for connecting to Azure Cosmos DB and managing file data.
 
+    Uses the async Cosmos client so database calls don't block the event loop.
+    The instance is created once at application startup and must be closed
+    with close() on shutdown.
+
     Attributes:
         client (CosmosClient): Cosmos DB client instance.
         database: Reference to the Cosmos DB database.
@@ -23,9 +81,10 @@ class CosmosService:
 
     def __init__(self):
         try:
-            credential = DefaultAzureCredential()
+            # Shared process-wide credential, closed by the application lifespan
+            self.credential = get_async_credential()
             self.client = CosmosClient(
-                url=settings.cosmos_db_uri, credential=credential
+                url=settings.cosmos_db_uri, credential=self.credential
             )
             self.database = self.client.get_database_client(settings.cosmos_db_database)
             self.container = self.database.get_container_client(
@@ -34,7 +93,7 @@ class CosmosService:
         except Exception as e:
             raise DatabaseError(f"Failed to initialize Cosmos DB client: {str(e)}")
 
-    def save_file(self, filename: str) -> str:
+    async def save_file(self, filename: str) -> str:
         """
         Save a file's metadata and content to Cosmos DB.
 
@@ -52,12 +111,12 @@ class CosmosService:
                 "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
             }
 
-            self.container.upsert_item(item)
+            await self.container.upsert_item(item)
             return file_id
-        except Exception as e:
-            raise DatabaseError(f"Failed to save file {filename}: {str(e)}")
+        except AzureError as e:
+            raise DatabaseError(f"Failed to save file {filename}: {str(e)}") from e
 
-    def get_file(self, file_id: str) -> FileMetadata:
+    async def get_file(self, file_id: str) -> FileMetadata:
         """
         Retrieve a file from Cosmos DB by its unique file_id.
 
@@ -68,32 +127,65 @@ class CosmosService:
             FileMetadata: The file item including 'id', 'filename' and 'created_at'.
         """
         try:
-            return self.container.read_item(item=file_id, partition_key=file_id)
+            return await self.container.read_item(item=file_id, partition_key=file_id)
         except cosmos_exceptions.CosmosResourceNotFoundError:
-            raise FileNotFoundError(file_id)
-        except Exception as e:
-            raise DatabaseError(f"Failed to get file {file_id}: {str(e)}")
+            raise StoredFileNotFoundError(file_id) from None
+        except AzureError as e:
+            raise DatabaseError(f"Failed to get file {file_id}: {str(e)}") from e
 
-    def list_files(self) -> List[FileMetadata]:
+    async def list_files(
+        self, max_item_count: int = 100, continuation: Optional[str] = None
+    ) -> Tuple[List[FileMetadata], Optional[str]]:
         """
-        Retrieve all files stored in Cosmos DB.
+        Retrieve one page of the files stored in Cosmos DB, newest first.
+
+        The items were written by this service, so they are built with
+        model_construct and skip validation. Callers must treat them as
+        read-only and not mutate them in place.
+
+        Args:
+            max_item_count (int): Maximum number of files in the page.
+            continuation (str, optional): Cursor returned with the previous page.
 
         Returns:
-            List[FileMetadata]: A list of file items.
+            Tuple[List[FileMetadata], Optional[str]]: The file items and the
+            cursor of the next page, None on the last page.
+
+        Raises:
+            FileValidationError: If the continuation token is not valid.
         """
+        # Checked before any query, a bad cursor never reaches Cosmos
+        state = _decode_cursor(continuation) if continuation else None
+        # One extra file tells whether another page follows
+        parameters = [{"name": "@limit", "value": max_item_count + 1}]
+        if state is None:
+            query = LIST_FILES_QUERY
+        else:
+            query = LIST_FILES_AFTER_QUERY
+            parameters += [
+                {"name": "@created_at", "value": state["created_at"]},
+                {"name": "@seen_ids", "value": state["ids"]},
+            ]
         try:
-            fields = f"c.{FileMetadata.ID}, c.{FileMetadata.FILENAME}, c.{FileMetadata.CREATED_AT}"
-            query = f"SELECT {fields} FROM c"
-            items = list(
-                self.container.query_items(
-                    query=query, enable_cross_partition_query=True
-                )
+            items = self.container.query_items(
+                query=query, parameters=parameters, max_item_count=max_item_count + 1
             )
-            return items
-        except Exception as e:
-            raise DatabaseError(f"Failed to list files: {str(e)}")
-
-    def delete_file(self, file_id: str) -> bool:
+            files = [FileMetadata.model_construct(**item) async for item in items]
+        except AzureError as e:
+            raise DatabaseError(f"Failed to list files: {str(e)}") from e
+
+        if len(files) <= max_item_count:
+            return files, None
+        files = files[:max_item_count]
+        last_created_at = files[-1].created_at
+        # The next page resumes after every file listed so far with the same
+        # created_at, not only the last one. Such a run can span several pages
+        seen_ids = [f.id for f in files if f.created_at == last_created_at]
+        if state is not None and state["created_at"] == last_created_at:
+            seen_ids = state["ids"] + seen_ids
+        return files, _encode_cursor({"created_at": last_created_at, "ids": seen_ids})
+
+    async def delete_file(self, file_id: str) -> bool:
         """
         Delete a file from Cosmos DB by its unique file_id.
 
@@ -104,9 +196,15 @@ class CosmosService:
             bool: True if deleted, False otherwise.
         """
         try:
-            self.container.delete_item(item=file_id, partition_key=file_id)
+            await self.container.delete_item(item=file_id, partition_key=file_id)
             return True
         except cosmos_exceptions.CosmosResourceNotFoundError:
-            raise FileNotFoundError(file_id)
-        except Exception as e:
-            raise DatabaseError(f"Failed to delete file {file_id}: {str(e)}")
+            raise StoredFileNotFoundError(file_id) from None
+        except AzureError as e:
+            raise DatabaseError(f"Failed to delete file {file_id}: {str(e)}") from e
+
+    async def close(self) -> None:
+        """
+        Close the Cosmos DB client. The shared credential is left open.
+        """
+        await self.client.close()
@@ -1,8 +1,24 @@
-from api.exceptions import FileProcessingError
+import asyncio
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from api.exceptions import FileProcessingError, SearchIndexingError
 from models.models import ProcessFileResult
 from services.file_pipeline.cosmos_service import CosmosService
 from services.file_pipeline.text_chuncker import TextChunker
-from services.file_pipeline.vector_store_service import VectoreStoreService
+from services.file_pipeline.vector_store_service import (
+    EMBED_BATCH_SIZE,
+    EMBED_MAX_CONCURRENCY,
+    VectoreStoreService,
+)
+
+# Chunks embedded per pipeline step, enough to keep every embedding request
+# slot busy, and how many steps may wait between two pipeline stages
+PIPELINE_BATCH_SIZE = EMBED_BATCH_SIZE * EMBED_MAX_CONCURRENCY
+PIPELINE_QUEUE_SIZE = 2
+
+# Files of a batch upload processed at the same time
+MAX_CONCURRENT_FILES = 8
 
 
 class FileService:
@@ -11,43 +27,151 @@ class FileService:
     1. Save file metadata to Cosmos DB.
     2. Split text into chunks and generate embeddings.
     3. Index chunks in Azure Search.
+    Chunking, embedding and indexing run as overlapping stages over batches.
     """
 
-    def __init__(self):
-        self.cosmos = CosmosService()
-        self.vector = VectoreStoreService()
-        self.chunk = TextChunker()
+    def __init__(
+        self,
+        cosmos: CosmosService,
+        vector: VectoreStoreService,
+        chunk: Optional[TextChunker] = None,
+    ):
+        """
+        Args:
+            cosmos (CosmosService): Shared Cosmos DB service.
+            vector (VectoreStoreService): Shared vector store service.
+            chunk (TextChunker, optional): Chunker to use, defaults to TextChunker().
+
+        The services are owned by the caller, which is responsible for closing them.
+        """
+        self.cosmos = cosmos
+        self.vector = vector
+        self.chunk = chunk or TextChunker()
 
-    def process_file(self, filename: str, content: str) -> ProcessFileResult:
+    async def process_file(self, filename: str, content: Iterable[str]) -> ProcessFileResult:
         """
         Full processing pipeline for a single file:
+        - Chunk the streamed text
         - Save file metadata to Cosmos DB
-        - Chunk text and compute embeddings
-        - Build document structure for search indexing
-        - Upload chunks to Azure Search
+        - Compute embeddings and upload chunks to Azure Search
 
         Args:
             filename (str): Name of the file.
+            content (Iterable[str]): Consecutive blocks of the file's text.
 
         Returns:
             dict: Metadata including file_id and number of chunks indexed.
         """
-        if not content:
+        # Split text into chunks while it is being read. Reading, parsing and
+        # tokenizing are blocking, so each batch is produced in a thread
+        chunks = self.chunk.iter_chunks(content)
+        first_batch = await asyncio.to_thread(_next_batch, chunks)
+        if not first_batch:
             raise FileProcessingError("File content is empty")
 
+        # Service errors (DatabaseError, SearchIndexingError) propagate as-is so
+        # the centralized handlers can map them to the right response
+        # Save file metadata to Cosmos DB
+        file_id: str = await self.cosmos.save_file(filename)
+        # Chunk the rest of the file, embed and upload chunks to Azure Search
+        chunks_indexed = await self._index_chunks(first_batch, chunks, file_id)
+
+        return {"file_id": file_id, "chunks_indexed": chunks_indexed}
+
+    async def process_files(
+        self,
+        items: List[Tuple[str, Iterable[str]]],
+        max_concurrency: int = MAX_CONCURRENT_FILES,
+    ) -> List[Union[ProcessFileResult, Exception]]:
+        """
+        Run process_file for several files concurrently, at most
+        max_concurrency at a time.
+
+        Args:
+            items (List[Tuple[str, Iterable[str]]]): (filename, content) pairs,
+                content as accepted by process_file.
+            max_concurrency (int): Maximum number of files processed at once.
+
+        Returns:
+            list: For each item, in order, the process_file result or the
+            exception that made that file fail. One failing file does not
+            stop the others.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run(filename: str, content: Iterable[str]) -> ProcessFileResult:
+            async with semaphore:
+                return await self.process_file(filename, content)
+
+        return await asyncio.gather(
+            *(run(filename, content) for filename, content in items),
+            return_exceptions=True,
+        )
+
+    async def _index_chunks(
+        self, first_batch: List[str], chunks: Iterator[str], file_id: str
+    ) -> int:
+        """
+        Chunk, embed and upload as a three-stage pipeline connected by
+        bounded queues: while batch N is uploaded, batch N+1 is embedded and
+        batch N+2 is chunked. Only a few batches are in memory at any time and
+        the total time is close to the slowest stage instead of the sum.
+
+        Args:
+            first_batch (List[str]): Chunks already taken from chunks.
+            chunks (Iterator[str]): The remaining text chunks of the file.
+            file_id (str): The file the chunks belong to.
+
+        Returns:
+            int: Number of chunks indexed.
+        """
+        chunk_queue: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        embed_queue: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+
+        async def chunk_batches() -> None:
+            try:
+                batch = first_batch
+                while batch:
+                    await chunk_queue.put(batch)
+                    batch = await asyncio.to_thread(_next_batch, chunks)
+            except Exception:
+                # Let the next stages drain and stop, the error is raised below
+                await chunk_queue.put(None)
+                raise
+            await chunk_queue.put(None)
+
+        async def embed_batches() -> None:
+            try:
+                while (batch := await chunk_queue.get()) is not None:
+                    vectors = await self.vector.aembed_chunks(batch)
+                    await embed_queue.put((batch, vectors))
+            except Exception:
+                await embed_queue.put(None)
+                raise
+            await embed_queue.put(None)
+
+        stages = [
+            asyncio.create_task(chunk_batches()),
+            asyncio.create_task(embed_batches()),
+        ]
+        chunks_indexed = 0
         try:
-            # Save file metadata to Cosmos DB
-            file_id: str = self.cosmos.save_file(filename)
-            # Split text into chunks
-            chunked_data = self.chunk.chunk_text(content)
-            # Upload chunks to Azure Search
-            self.vector.upload_chunks(chunked_data, file_id)
-
-            return {"file_id": file_id, "chunks_indexed": len(chunked_data)}
-        except Exception as e:
-            raise FileProcessingError(f"Failed to process file {filename}: {str(e)}")
-        
-    def delete_file(self, file_id: str) -> bool:
+            while (item := await embed_queue.get()) is not None:
+                batch, vectors = item
+                await self.vector.upload_embeddings(batch, vectors, file_id)
+                chunks_indexed += len(batch)
+        finally:
+            # Stops the stages still waiting on one that failed, no-op for
+            # the stages that finished
+            for stage in stages:
+                stage.cancel()
+            results = await asyncio.gather(*stages, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+        return chunks_indexed
+
+    async def delete_file(self, file_id: str) -> bool:
         """
         Delete a file and its associated chunks from both Cosmos DB and Azure Search.
 
@@ -59,11 +183,18 @@ class FileService:
         if not file_id:
             raise FileProcessingError("file_id cannot be empty")
 
-        try:
-            # Delete chunks from Azure Search
-            self.vector.delete_chunks_by_document_id(file_id)
-            # Delete file metadata from Cosmos DB
-            self.cosmos.delete_file(file_id)
-            return True
-        except Exception as e:
-            raise FileProcessingError(f"Failed to delete file {file_id}: {str(e)}")
+        # Delete chunks from Azure Search first. If that fails the metadata
+        # is kept, the file stays listed and the delete can be retried.
+        # Errors are raised as-is so the handlers keep mapping them
+        if await self.vector.delete_chunks_by_document_id(file_id) is False:
+            raise SearchIndexingError(
+                f"Failed to delete some chunks of file {file_id}"
+            )
+        # Delete file metadata from Cosmos DB, a missing file surfaces as a 404
+        await self.cosmos.delete_file(file_id)
+        return True
+
+
+def _next_batch(chunks: Iterator[str]) -> List[str]:
+    # Pull the next pipeline batch, empty once the chunks are exhausted
+    return list(islice(chunks, PIPELINE_BATCH_SIZE))
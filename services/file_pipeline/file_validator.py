@@ -1,31 +1,42 @@
+import os
+from typing import List
+
 from fastapi import File, UploadFile
 
 from api.exceptions import FileValidationError
 
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5 MB
-ALLOWED_EXTENSIONS = {".txt", ".pdf", ".docx"}
+ALLOWED_EXTENSIONS = frozenset({".txt", ".pdf", ".docx"})
+MAX_FILES_PER_UPLOAD = 10
 
 
 async def validate_file(file: UploadFile = File(...)) -> UploadFile:
-    # Validate extension
-    if not any(file.filename.endswith(ext) for ext in ALLOWED_EXTENSIONS):
+    # Validate extension (case-insensitive) before reading any of the body
+    if os.path.splitext(file.filename)[1].lower() not in ALLOWED_EXTENSIONS:
+        raise FileValidationError(
+            f"Only {', '.join(sorted(ALLOWED_EXTENSIONS))} files are supported"
+        )
+
+    # Validate size. The body is already spooled by the multipart parser, so
+    # measure the underlying file instead of reading it back through Python
+    f = file.file
+    f.seek(0, os.SEEK_END)
+    size = f.tell()
+    f.seek(0)
+    if size > MAX_FILE_SIZE:
         raise FileValidationError(
-            f"Only {', '.join(ALLOWED_EXTENSIONS)} files are supported"
+            f"File size exceeds {MAX_FILE_SIZE // (1024*1024)} MB limit"
         )
 
-    # Validate size
-    size = 0
-    chunk_size = 1024 * 1024
-    while True:
-        chunk = await file.read(chunk_size)
-        if not chunk:
-            break
-        size += len(chunk)
-        if size > MAX_FILE_SIZE:
-            raise FileValidationError(
-                f"File size exceeds {MAX_FILE_SIZE // (1024*1024)} MB limit"
-            )
-
-    # Reset file pointer for downstream processing
-    await file.seek(0)
     return file
+
+
+async def validate_files(files: List[UploadFile] = File(...)) -> List[UploadFile]:
+    # Reject the whole batch if any file is invalid, before processing starts
+    if len(files) > MAX_FILES_PER_UPLOAD:
+        raise FileValidationError(
+            f"At most {MAX_FILES_PER_UPLOAD} files can be uploaded at once"
+        )
+    for file in files:
+        await validate_file(file)
+    return files
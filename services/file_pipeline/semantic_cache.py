@@ -0,0 +1,82 @@
+import time
+from collections import OrderedDict
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+
+class SemanticQueryCache:
+    """
+    Bounded cache of search results keyed on the query embedding, so that
+    paraphrases of a recent question reuse its results.
+
+    A lookup hits when a cached query with the same search options has a
+    cosine similarity of at least `threshold` with the new query. The query
+    vectors are kept in one float32 matrix, a lookup is a single matrix-vector
+    product. Entries expire after `ttl` seconds and the least recently used
+    entry is evicted when the cache is full.
+    """
+
+    def __init__(self, maxsize: int, threshold: float, ttl: float):
+        self.maxsize = maxsize
+        self.threshold = threshold
+        self.ttl = ttl
+        # Allocated on the first put, once the embedding dimension is known
+        self._vectors: Optional[np.ndarray] = None
+        # Row of _vectors -> (options key, expiry time, results), in LRU order
+        self._entries: "OrderedDict[int, Tuple[bytes, float, List[Any]]]" = OrderedDict()
+        self._free_rows = list(range(maxsize))
+
+    def get(self, vector: np.ndarray, options_key: bytes) -> Optional[List[Any]]:
+        """
+        Return the results of the most similar cached query with the same
+        options, or None if no cached query is similar enough.
+        """
+        if not self._entries:
+            return None
+
+        rows = np.fromiter(self._entries, dtype=np.intp, count=len(self._entries))
+        scores = self._vectors[rows] @ _normalize(vector)
+        now = time.monotonic()
+        for i in np.argsort(scores)[::-1]:
+            if scores[i] < self.threshold:
+                return None
+            row = int(rows[i])
+            key, expires_at, results = self._entries[row]
+            if expires_at <= now:
+                self._remove(row)
+            elif key == options_key:
+                self._entries.move_to_end(row)
+                return results
+        return None
+
+    def put(self, vector: np.ndarray, options_key: bytes, results: List[Any]) -> None:
+        """
+        Cache the results of a query, evicting the least recently used entry
+        if the cache is full.
+        """
+        if self._vectors is None:
+            self._vectors = np.zeros((self.maxsize, len(vector)), dtype=np.float32)
+        if self._free_rows:
+            row = self._free_rows.pop()
+        else:
+            row, _ = self._entries.popitem(last=False)
+        self._vectors[row] = _normalize(vector)
+        self._entries[row] = (options_key, time.monotonic() + self.ttl, results)
+
+    def clear(self) -> None:
+        """
+        Drop every cached entry.
+        """
+        self._entries.clear()
+        self._free_rows = list(range(self.maxsize))
+
+    def _remove(self, row: int) -> None:
+        del self._entries[row]
+        self._free_rows.append(row)
+
+
+def _normalize(vector: np.ndarray) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
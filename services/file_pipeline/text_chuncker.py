@@ -1,12 +1,26 @@
-from typing import List
+import functools
+from typing import Iterable, Iterator, List, Sequence
 
-from langchain.text_splitter import TokenTextSplitter
+import tiktoken
 
 from api.exceptions import FileProcessingError
 
+# Amount of streamed text buffered before it is tokenized
+STREAM_BUFFER_SIZE = 64 * 1024
+
+
+@functools.lru_cache(maxsize=4)
+def _get_encoding(encoding_name: str) -> tiktoken.Encoding:
+    """
+    Load a tiktoken encoding once per process. Loading builds the BPE ranks,
+    which is far more expensive than encoding a single file.
+    """
+    return tiktoken.get_encoding(encoding_name)
+
+
 class TextChunker:
     """
-    A service class for chunking text using LangChain's TokenTextSplitter.
+    A service class for chunking text into windows of tiktoken tokens.
     """
     
     def __init__(
@@ -16,38 +30,103 @@ class TextChunker:
         encoding_name: str = "cl100k_base"
     ):
         """
-        Initialize the TextChunker with TokenTextSplitter configuration.
+        Initialize the TextChunker with its tokenizer configuration.
         
         Args:
-            chunk_size (int): Maximum number of tokens per chunk. Default is 1000.
-            chunk_overlap (int): Number of tokens to overlap between chunks. Default is 100.
+            chunk_size (int): Maximum number of tokens per chunk. Default is 512.
+            chunk_overlap (int): Number of tokens to overlap between chunks. Default is 50.
             encoding_name (str): The encoding to use for tokenization. Default is "cl100k_base".
         """
-        # Initialize the TokenTextSplitter
+        if chunk_overlap >= chunk_size:
+            raise FileProcessingError(
+                f"Chunk overlap ({chunk_overlap}) must be smaller than chunk size ({chunk_size})"
+            )
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
         try:
-            self.splitter = TokenTextSplitter(
-            chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap,
-            encoding_name=encoding_name
-        )
+            self.encoding = _get_encoding(encoding_name)
         except Exception as e:
             raise FileProcessingError(
-                f"Failed to initialize TokenTextSplitter: {str(e)}"
+                f"Failed to load tokenizer encoding: {str(e)}"
             )
-        
-    
+
+    def _split_ids(self, ids: Sequence[int], covered: int = 0) -> List[str]:
+        """
+        Decode windows of chunk_size tokens, each starting chunk_overlap tokens
+        before the end of the previous one, until the end of ids is reached.
+        Nothing is emitted if ids holds no tokens past the first `covered`.
+        """
+        chunks: List[str] = []
+        if len(ids) <= covered:
+            return chunks
+        stride = self.chunk_size - self.chunk_overlap
+        start = 0
+        while True:
+            end = min(start + self.chunk_size, len(ids))
+            chunks.append(self.encoding.decode(ids[start:end]))
+            if end == len(ids):
+                return chunks
+            start += stride
+
     def chunk_text(self, text: str) -> List[str]:
         """
         Splits a given text into smaller token-based chunks.
 
+        The text is tokenized once and the chunks are sliced from the token
+        ids, so no text is tokenized twice.
+
         Args:
             text (str): The input text to be split into chunks.
 
         Returns:
-            List[str]: A list of text chunks, each with a maximum number of tokens
-                       defined by the TokenTextSplitter configuration.
+            List[str]: A list of text chunks, each with at most chunk_size tokens.
+        """
+        try:
+            return self._split_ids(self.encoding.encode_ordinary(text))
+        except Exception as e:
+            raise FileProcessingError(f"Failed to chunk text: {str(e)}")
+
+    def iter_chunks(self, blocks: Iterable[str]) -> Iterator[str]:
+        """
+        Lazily splits streamed text into the same token-based chunks as
+        chunk_text, holding only a bounded window of the text in memory.
+
+        Whenever the buffer grows past STREAM_BUFFER_SIZE it is tokenized up
+        to its last whitespace, so no word is split across two encode calls.
+        Every complete window is yielded and the token ids from the start of
+        the next window are carried over, which preserves the overlap.
+
+        Args:
+            blocks (Iterable[str]): Consecutive blocks of the input text.
+
+        Yields:
+            str: Consecutive text chunks.
         """
+        stride = self.chunk_size - self.chunk_overlap
+        ids: List[int] = []
+        # Leading ids already part of a yielded chunk
+        covered = 0
+        buffer = ""
         try:
-            return self.splitter.split_text(text)
+            for block in blocks:
+                buffer += block
+                if len(buffer) < STREAM_BUFFER_SIZE:
+                    continue
+                cut = max(buffer.rfind(" "), buffer.rfind("\n"))
+                if cut <= 0:
+                    cut = len(buffer)
+                ids.extend(self.encoding.encode_ordinary(buffer[:cut]))
+                buffer = buffer[cut:]
+                start = 0
+                while start + self.chunk_size <= len(ids):
+                    yield self.encoding.decode(ids[start:start + self.chunk_size])
+                    start += stride
+                if start:
+                    ids = ids[start:]
+                    covered = self.chunk_overlap
+            ids.extend(self.encoding.encode_ordinary(buffer))
+            yield from self._split_ids(ids, covered)
+        except FileProcessingError:
+            raise
         except Exception as e:
             raise FileProcessingError(f"Failed to chunk text: {str(e)}")
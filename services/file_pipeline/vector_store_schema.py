@@ -1,11 +1,20 @@
 # search_schema.py
 from azure.search.documents.indexes.models import (
+    HnswAlgorithmConfiguration,
+    HnswParameters,
+    ScalarQuantizationCompression,
+    ScalarQuantizationParameters,
     SimpleField,
     SearchableField,
     SearchField,
     SearchFieldDataType,
+    VectorSearch,
+    VectorSearchAlgorithmMetric,
+    VectorSearchProfile,
 )
 
+VECTOR_SEARCH_PROFILE = "vector-profile-1758207307698"
+
 FIELDS = [
     SimpleField(
         name="id",
@@ -34,7 +43,7 @@ FIELDS = [
         sortable=False,
         facetable=False,
         vector_search_dimensions=1536,
-        vector_search_profile_name="vector-profile-1758207307698",
+        vector_search_profile_name=VECTOR_SEARCH_PROFILE,
     ),
     SearchableField(
         name="metadata",
@@ -52,3 +61,28 @@ FIELDS = [
         analyzer_name="standard.lucene",
     )
 ]
+
+# Vectors are indexed as int8 with scalar quantization, a quarter of the
+# float32 size, so more of the HNSW graph fits in memory. The originals are
+# kept by the service to rescore the top quantized matches
+VECTOR_SEARCH = VectorSearch(
+    algorithms=[
+        HnswAlgorithmConfiguration(
+            name="hnsw",
+            parameters=HnswParameters(metric=VectorSearchAlgorithmMetric.COSINE),
+        )
+    ],
+    compressions=[
+        ScalarQuantizationCompression(
+            compression_name="scalar-quantization",
+            parameters=ScalarQuantizationParameters(quantized_data_type="int8"),
+        )
+    ],
+    profiles=[
+        VectorSearchProfile(
+            name=VECTOR_SEARCH_PROFILE,
+            algorithm_configuration_name="hnsw",
+            compression_name="scalar-quantization",
+        )
+    ],
+)
@@ -1,16 +1,86 @@
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
-import uuid
+import asyncio
+import hashlib
+import os
+import re
 
-from azure.identity import DefaultAzureCredential
-from langchain_community.vectorstores.azuresearch import AzureSearch
+import httpx
+import numpy as np
+import openai
+import orjson
+from azure.core.exceptions import AzureError
+from azure.search.documents.models import VectorizedQuery
+from cachetools import LRUCache, TTLCache
+from langchain_community.vectorstores.azuresearch import (
+    FIELDS_CONTENT,
+    FIELDS_CONTENT_VECTOR,
+    FIELDS_ID,
+    FIELDS_METADATA,
+    AzureSearch,
+)
 from langchain_openai import AzureOpenAIEmbeddings
 from langchain_core.documents import Document
 
 from api.exceptions import SearchIndexingError
-from services.file_pipeline.vector_store_schema import FIELDS
+from services.credential import (
+    get_async_credential,
+    get_async_token_provider,
+    get_credential,
+    get_token_provider,
+)
+from services.file_pipeline.semantic_cache import SemanticQueryCache
+from services.file_pipeline.vector_store_schema import FIELDS, VECTOR_SEARCH
 from settings import settings
 
+# Chunks per embedding request and how many requests may be in flight at once,
+# across all requests of the process
+EMBED_BATCH_SIZE = settings.embedding_batch_size
+EMBED_MAX_CONCURRENCY = settings.embedding_max_concurrency
+
+# Azure Search accepts at most 1000 documents / 16 MB per indexing request.
+# Stay well below both and send a few requests at once
+UPLOAD_BATCH_MAX_DOCS = 500
+UPLOAD_BATCH_MAX_BYTES = 8 * 1024 * 1024
+UPLOAD_MAX_CONCURRENCY = 4
+DELETE_BATCH_MAX_DOCS = 1000
+
+# File ids are UUIDs. Restricting them to these characters means they can be
+# put in an OData string literal without escaping
+DOCUMENT_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]+")
+
+# Search filter per (document_id given, filter_expression given). The custom
+# expression is parenthesized so an "or" in it cannot widen the file filter
+_FILTER_TEMPLATES = {
+    (False, False): None,
+    (True, False): "file_id eq '{document_id}'",
+    (False, True): "{filter_expression}",
+    (True, True): "file_id eq '{document_id}' and ({filter_expression})",
+}
+
+
+def _split_upload_batches(documents: List[Dict]) -> List[List[Dict]]:
+    """
+    Group documents into upload batches capped by UPLOAD_BATCH_MAX_DOCS and
+    UPLOAD_BATCH_MAX_BYTES (measured as serialized JSON).
+    """
+    batches: List[List[Dict]] = []
+    batch: List[Dict] = []
+    batch_bytes = 0
+    for document in documents:
+        size = len(orjson.dumps(document))
+        if batch and (
+            len(batch) >= UPLOAD_BATCH_MAX_DOCS
+            or batch_bytes + size > UPLOAD_BATCH_MAX_BYTES
+        ):
+            batches.append(batch)
+            batch, batch_bytes = [], 0
+        batch.append(document)
+        batch_bytes += size
+    if batch:
+        batches.append(batch)
+    return batches
+
 
 class VectoreStoreService:
     """
@@ -22,24 +92,44 @@ class VectoreStoreService:
     Attributes:
         vector_store (AzureSearch): LangChain vector store for all operations.
         embeddings: Embedding service for generating vectors.
+        search_cache (TTLCache): Short-lived cache of similarity search results.
+        semantic_cache (SemanticQueryCache): Search results of recent queries by
+            query embedding, so paraphrased questions hit too. Opt-in.
+        embedding_cache (LRUCache): float32 vectors of recently embedded chunk texts.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        http_client: Optional[httpx.Client] = None,
+        http_async_client: Optional[httpx.AsyncClient] = None,
+    ):
         """
         Initialize the VectoreStoreService with LangChain Azure Search integration.
         
-        Uses DefaultAzureCredential for secure authentication following Azure best practices.
+        Authenticates with the shared process-wide credential, see services.credential.
+
+        Args:
+            http_client (httpx.Client, optional): Shared client for sync embedding calls.
+            http_async_client (httpx.AsyncClient, optional): Shared client for async embedding calls.
         """
         try:
             # Use managed identity for secure authentication
-            credential = DefaultAzureCredential()
+            credential = get_credential()
             
             # Initialize Azure OpenAI embeddings service
             self.embeddings = AzureOpenAIEmbeddings(
                 azure_endpoint=settings.azure_openai_endpoint,
                 azure_deployment=settings.azure_openai_embedding_deployment,
                 api_version=settings.azure_openai_embedding_api_version,
-                azure_ad_token_provider=lambda: credential.get_token("https://cognitiveservices.azure.com/.default").token,
+                # Shared, cached tokens from the process-wide credential
+                azure_ad_token_provider=get_token_provider(),
+                azure_ad_async_token_provider=get_async_token_provider(),
+                # The SDK retries 429s and transient errors with jittered backoff
+                max_retries=settings.azure_openai_max_retries,
+                # Also used when the vector store embeds through the SDK itself
+                chunk_size=EMBED_BATCH_SIZE,
+                http_client=http_client,
+                http_async_client=http_async_client,
             )
             
             # Initialize LangChain AzureSearch vector store
@@ -47,18 +137,123 @@ class VectoreStoreService:
                 azure_search_endpoint=settings.azure_search_endpoint,
                 azure_search_key=None,  # Using managed identity instead
                 index_name=settings.azure_search_index,
-                embedding_function=self.embeddings.embed_query,
+                embedding_function=self.embeddings,
                 search_type="similarity",
-                semantic_configuration_name="default",
-                fields=FIELDS
+                # Only used by semantic searches, see similarity_search
+                semantic_configuration_name=settings.azure_search_semantic_configuration,
+                fields=FIELDS,
+                # Only applied when the index does not exist yet
+                vector_search=VECTOR_SEARCH,
+                azure_credential=credential,
+                azure_async_credential=get_async_credential(),
             )
             
         except Exception as e:
             raise SearchIndexingError(f"Failed to initialize Search client: {str(e)}")
 
-    def upload_chunks(self, chunks: List[str], document_id: str) -> List[str]:
+        # Shared by every ingestion so concurrent uploads together stay within
+        # the deployment's rate limit instead of each getting their own budget
+        self._embed_semaphore = asyncio.Semaphore(EMBED_MAX_CONCURRENCY)
+
+        # Repeated questions skip the embedding + search round-trip. Keep the
+        # TTL low so newly indexed files show up quickly (0 disables the cache)
+        self.search_cache: Optional[TTLCache] = (
+            TTLCache(
+                maxsize=settings.vector_search_cache_size,
+                ttl=settings.vector_search_cache_ttl_seconds,
+            )
+            if settings.vector_search_cache_ttl_seconds > 0
+            else None
+        )
+
+        # Paraphrases of recent questions reuse their results. Each lookup
+        # embeds the query, so it is off by default (size 0)
+        self.semantic_cache: Optional[SemanticQueryCache] = (
+            SemanticQueryCache(
+                maxsize=settings.vector_search_semantic_cache_size,
+                threshold=settings.vector_search_semantic_cache_threshold,
+                ttl=settings.vector_search_cache_ttl_seconds,
+            )
+            if settings.vector_search_semantic_cache_size > 0
+            and settings.vector_search_cache_ttl_seconds > 0
+            else None
+        )
+
+        # Re-uploaded or overlapping documents reuse the vectors of chunks
+        # that were embedded before (0 disables the cache)
+        self.embedding_cache: Optional[LRUCache] = (
+            LRUCache(maxsize=settings.embedding_cache_size)
+            if settings.embedding_cache_size > 0
+            else None
+        )
+
+    async def aembed_chunks(self, chunks: List[str]) -> np.ndarray:
         """
-        Upload a batch of text chunks to the search index.
+        Embed chunks, taking the vectors of already seen texts from the
+        embedding cache and embedding each remaining distinct text once.
+
+        Args:
+            chunks (List[str]): Text chunks to embed.
+
+        Returns:
+            np.ndarray: float32 array with one row per chunk, in the order of chunks.
+
+        Raises:
+            SearchIndexingError: If an embedding request fails.
+        """
+        if self.embedding_cache is None or not chunks:
+            return await self._aembed_batches(chunks)
+
+        keys = [self._embedding_cache_key(chunk) for chunk in chunks]
+        vectors = [self.embedding_cache.get(key) for key in keys]
+
+        pending: Dict[bytes, str] = {}
+        for key, chunk, vector in zip(keys, chunks, vectors):
+            if vector is None:
+                pending.setdefault(key, chunk)
+        if not pending:
+            return np.stack(vectors)
+
+        embedded = dict(zip(pending, await self._aembed_batches(list(pending.values()))))
+        # Rows are views into the batch array, copy them so a cached entry
+        # does not keep the whole batch alive
+        self.embedding_cache.update(
+            (key, vector.copy()) for key, vector in embedded.items()
+        )
+        # Fill from the local dict, the cache may already have evicted entries
+        return np.stack([
+            vector if vector is not None else embedded[key]
+            for key, vector in zip(keys, vectors)
+        ])
+
+    async def _aembed_batches(self, chunks: List[str]) -> np.ndarray:
+        """
+        Embed chunks in sub-batches of EMBED_BATCH_SIZE sent concurrently, with
+        at most EMBED_MAX_CONCURRENCY requests in flight for the whole service.
+
+        The vectors are packed into one float32 array, a quarter of the size
+        of lists of Python floats. The model returns float32 values, so no
+        precision is lost.
+        """
+        async def embed_batch(batch: List[str]) -> List[List[float]]:
+            async with self._embed_semaphore:
+                return await self.embeddings.aembed_documents(batch)
+
+        try:
+            # gather keeps the batches in order, so flattening preserves chunk order
+            batches = await asyncio.gather(*(
+                embed_batch(chunks[i:i + EMBED_BATCH_SIZE])
+                for i in range(0, len(chunks), EMBED_BATCH_SIZE)
+            ))
+        except (openai.OpenAIError, AzureError) as e:
+            raise SearchIndexingError(f"Failed to embed chunks: {str(e)}") from e
+        return np.array(
+            [vector for batch in batches for vector in batch], dtype=np.float32
+        )
+
+    async def upload_chunks(self, chunks: List[str], document_id: str) -> List[str]:
+        """
+        Embed a batch of text chunks and upload them to the search index.
 
         Args:
             chunks (List[str]): A list of text chunks to upload.
@@ -67,6 +262,29 @@ class VectoreStoreService:
         Returns:
             List[str]: List of document IDs that were uploaded.
         
+        Raises:
+            SearchIndexingError: If the embedding or upload operation fails.
+        """
+        if not chunks:
+            return []
+
+        vectors = await self.aembed_chunks(chunks)
+        return await self.upload_embeddings(chunks, vectors, document_id)
+
+    async def upload_embeddings(
+        self, chunks: List[str], vectors: np.ndarray, document_id: str
+    ) -> List[str]:
+        """
+        Upload already embedded text chunks to the search index.
+
+        Args:
+            chunks (List[str]): A list of text chunks to upload.
+            vectors (np.ndarray): The embedding of each chunk, see aembed_chunks.
+            document_id (str): The document ID that these chunks belong to.
+
+        Returns:
+            List[str]: List of document IDs that were uploaded.
+
         Raises:
             SearchIndexingError: If the upload operation fails.
         """
@@ -77,32 +295,52 @@ class VectoreStoreService:
             raise ValueError("document_id cannot be empty")
         
         try:
-            # Convert text chunks to LangChain Document objects
-            documents = []
-            current_timestamp = datetime.now().isoformat()
-            
-            for i, chunk_text in enumerate(chunks):
-                
-                # Create metadata as separate fields instead of using the model
-                metadata = {
+            # Same document layout as AzureSearch.aadd_embeddings. Every chunk
+            # of the file shares the metadata, so it is serialized once
+            metadata = orjson.dumps({
+                "file_id": document_id,
+                "created_at": datetime.now().isoformat()
+            }).decode()
+            # 128 random bits per key, drawn with a single urandom call and
+            # hex-encoded (valid key characters) instead of one uuid4 per chunk
+            keys = os.urandom(16 * len(chunks)).hex()
+            documents = [
+                {
+                    "@search.action": "upload",
+                    FIELDS_ID: keys[i * 32:(i + 1) * 32],
+                    FIELDS_CONTENT: chunk_text,
+                    # Lists only at the REST boundary, the SDK serializes them
+                    FIELDS_CONTENT_VECTOR: vector.tolist(),
+                    FIELDS_METADATA: metadata,
                     "file_id": document_id,
-                    "created_at": current_timestamp
                 }
-                
-                document = Document(
-                    page_content=chunk_text,
-                    metadata=metadata
+                for i, (chunk_text, vector) in enumerate(zip(chunks, vectors))
+            ]
+
+            semaphore = asyncio.Semaphore(UPLOAD_MAX_CONCURRENCY)
+
+            async def upload_batch(batch: List[Dict]) -> list:
+                async with semaphore:
+                    return await self.vector_store.async_client.upload_documents(
+                        documents=batch
+                    )
+
+            results = await asyncio.gather(*(
+                upload_batch(batch) for batch in _split_upload_batches(documents)
+            ))
+            self._clear_search_cache()
+
+            failed = [r.key for batch in results for r in batch if not r.succeeded]
+            if failed:
+                raise SearchIndexingError(
+                    f"Failed to index {len(failed)} of {len(documents)} chunks"
                 )
-                documents.append(document)
-            
-            # Use LangChain's add_documents method
-            doc_ids = self.vector_store.add_documents(documents)
-            return doc_ids
-            
-        except Exception as e:
-            raise SearchIndexingError(f"Failed to upload chunks: {str(e)}")
+            return [document[FIELDS_ID] for document in documents]
+
+        except AzureError as e:
+            raise SearchIndexingError(f"Failed to upload chunks: {str(e)}") from e
 
-    def delete_chunks_by_document_id(self, document_id: str) -> bool:
+    async def delete_chunks_by_document_id(self, document_id: str) -> bool:
         """
         Delete all chunks associated with a specific document ID from the search index.
 
@@ -114,41 +352,54 @@ class VectoreStoreService:
         
         Raises:
             SearchIndexingError: If the deletion operation fails.
-            ValueError: If document_id is empty.
+            ValueError: If document_id is empty or not a valid file ID.
         """
         if not document_id:
             raise ValueError("document_id cannot be empty")
+        if not DOCUMENT_ID_PATTERN.fullmatch(document_id):
+            raise ValueError("document_id contains invalid characters")
         
         try:
-            # Get all documents matching the file_id
-            results = self.vector_store.client.search(
+            # Get all documents matching the file_id. Only the key is selected,
+            # the vectors and content would be downloaded just to be dropped
+            results = await self.vector_store.async_client.search(
                 search_text="",
-                filter=f"file_id eq '{document_id}'"
+                filter=_FILTER_TEMPLATES[True, False].format(document_id=document_id),
+                select=[FIELDS_ID],
             )
 
-            # Collect their IDs (primary key in your index schema)
-            doc_ids = [{"id": doc["id"]} for doc in results]
+            # Collect their IDs (primary key in your index schema). Deleting
+            # only after paging through all of them keeps the pages stable
+            doc_ids = [{FIELDS_ID: doc[FIELDS_ID]} async for doc in results]
 
             if not doc_ids:
                 return  # Nothing to delete
 
-            # Delete documents from the index
-            results = self.vector_store.client.delete_documents(doc_ids)
-            return all(result.succeeded for result in results)
+            # Delete documents from the index, within the per-request limit
+            succeeded = True
+            for start in range(0, len(doc_ids), DELETE_BATCH_MAX_DOCS):
+                results = await self.vector_store.async_client.delete_documents(
+                    doc_ids[start:start + DELETE_BATCH_MAX_DOCS]
+                )
+                succeeded &= all(result.succeeded for result in results)
+            self._clear_search_cache()
+            return succeeded
             
-        except Exception as e:
-            raise SearchIndexingError(f"Failed to delete chunks for document {document_id}: {str(e)}")
+        except AzureError as e:
+            raise SearchIndexingError(f"Failed to delete chunks for document {document_id}: {str(e)}") from e
 
-    def similarity_search(
+    async def similarity_search(
         self, 
         query: str, 
         k: int = 10, 
         score_threshold: Optional[float] = 0.6,
         filter_expression: Optional[str] = None,
-        document_id: Optional[str] = None
+        document_id: Optional[str] = None,
+        semantic: bool = False,
     ) -> List[Tuple[Document, float]]:
         """
-        Perform similarity search combining vector and keyword search.
+        Perform vector similarity search, or hybrid search with semantic
+        ranking when semantic is set.
 
         Args:
             query (str): The search query text.
@@ -156,45 +407,71 @@ class VectoreStoreService:
             score_threshold (Optional[float]): Minimum relevance score threshold.
             filter_expression (Optional[str]): OData filter expression for metadata filtering.
             document_id (Optional[str]): If provided, search only within chunks of this document.
+            semantic (bool): Rerank hybrid results with the semantic ranker. Slower
+                and billed per query. Scores are then reranker scores (0-4).
 
         Returns:
             List[Tuple[Document, float]]: List of (document, relevance_score) tuples.
         
         Raises:
             SearchIndexingError: If the search operation fails.
-            ValueError: If query is empty.
+            ValueError: If query is empty, document_id is not a valid file ID, or
+                semantic is set without a semantic configuration.
         """
         if not query or not query.strip():
             raise ValueError("Search query cannot be empty")
+        if document_id and not DOCUMENT_ID_PATTERN.fullmatch(document_id):
+            raise ValueError("document_id contains invalid characters")
+        if semantic and not settings.azure_search_semantic_configuration:
+            raise ValueError("Semantic search requires a semantic configuration")
+
+        cache_key = None
+        if self.search_cache is not None:
+            cache_key = self._search_cache_key(
+                query, k, score_threshold, filter_expression, document_id, semantic
+            )
+            cached = self.search_cache.get(cache_key)
+            if cached is not None:
+                return list(cached)
         
         try:
-            # Build filter expression
-            filters = []
-            
-            # Add document-specific filter if provided
-            if document_id:
-                filters.append(f"file_id eq '{document_id}'")
-            
-            # Add custom filter expression if provided
-            if filter_expression:
-                filters.append(filter_expression)
-            
-            # Combine filters with AND operator
-            combined_filter = " and ".join(filters) if filters else None
-            
-            
             search_kwargs = {
                 "k": k,
             }
+
+            template = _FILTER_TEMPLATES[bool(document_id), bool(filter_expression)]
+            if template is not None:
+                search_kwargs["filters"] = template.format(
+                    document_id=document_id, filter_expression=filter_expression
+                )
             
-            if combined_filter:
-                search_kwargs["filter"] = combined_filter
-            
-            # Use similarity_search_with_score for relevance scores
-            results = self.vector_store.similarity_search_with_score(
-                query=query,
-                **search_kwargs
-            )
+            # Semantic searches rank on the query text, not only its vector
+            use_semantic_cache = self.semantic_cache is not None and not semantic
+            if semantic:
+                results = await self.vector_store.asemantic_hybrid_search_with_score(
+                    query=query,
+                    score_type="reranker_score",
+                    **search_kwargs
+                )
+            elif use_semantic_cache:
+                query_vector = np.asarray(
+                    await self.embeddings.aembed_query(query), dtype=np.float32
+                )
+                options_key = self._search_options_key(
+                    k, score_threshold, filter_expression, document_id
+                )
+                cached = self.semantic_cache.get(query_vector, options_key)
+                if cached is not None:
+                    return list(cached)
+                # Search with the vector we already have instead of letting
+                # the vector store embed the query a second time
+                results = await self._asearch_by_vector(query_vector, **search_kwargs)
+            else:
+                # Async variant embeds the query and searches without blocking the event loop
+                results = await self.vector_store.asimilarity_search_with_score(
+                    query=query,
+                    **search_kwargs
+                )
             
             # Filter by score threshold if provided
             if score_threshold is not None:
@@ -202,8 +479,102 @@ class VectoreStoreService:
                     (doc, score) for doc, score in results 
                     if score >= score_threshold
                 ]
+
+            if cache_key is not None:
+                self.search_cache[cache_key] = results
+            if use_semantic_cache:
+                self.semantic_cache.put(query_vector, options_key, results)
             
-            return results
+            return list(results)
             
-        except Exception as e:
-            raise SearchIndexingError(f"Failed to perform similarity search: {str(e)}")
\ No newline at end of file
+        except (openai.OpenAIError, AzureError) as e:
+            raise SearchIndexingError(f"Failed to perform similarity search: {str(e)}") from e
+
+    async def _asearch_by_vector(
+        self, vector: np.ndarray, k: int, filters: Optional[str] = None
+    ) -> List[Tuple[Document, float]]:
+        """
+        Vector search with an already embedded query, returning the same
+        (document, score) pairs as AzureSearch.asimilarity_search_with_score.
+        The vectors themselves are not retrieved.
+        """
+        results = await self.vector_store.async_client.search(
+            search_text=None,
+            vector_queries=[
+                VectorizedQuery(
+                    vector=vector.tolist(),
+                    k_nearest_neighbors=k,
+                    fields=FIELDS_CONTENT_VECTOR,
+                )
+            ],
+            filter=filters,
+            select=[FIELDS_ID, FIELDS_CONTENT, FIELDS_METADATA],
+            top=k,
+        )
+        return [
+            (
+                Document(
+                    page_content=result[FIELDS_CONTENT],
+                    metadata={
+                        FIELDS_ID: result[FIELDS_ID],
+                        **orjson.loads(result[FIELDS_METADATA]),
+                    },
+                ),
+                float(result["@search.score"]),
+            )
+            async for result in results
+        ]
+
+    @staticmethod
+    def _search_cache_key(
+        query: str,
+        k: int,
+        score_threshold: Optional[float],
+        filter_expression: Optional[str],
+        document_id: Optional[str],
+        semantic: bool,
+    ) -> bytes:
+        """
+        Build the search cache key from the normalized query and search options.
+        """
+        normalized = " ".join(query.lower().split())
+        raw = f"{normalized}\x00{k}\x00{score_threshold}\x00{filter_expression}\x00{document_id}\x00{semantic}"
+        return hashlib.sha256(raw.encode()).digest()
+
+    @staticmethod
+    def _search_options_key(
+        k: int,
+        score_threshold: Optional[float],
+        filter_expression: Optional[str],
+        document_id: Optional[str],
+    ) -> bytes:
+        """
+        Build the semantic cache key of the search options, cached results
+        are only reused for the same options.
+        """
+        raw = f"{k}\x00{score_threshold}\x00{filter_expression}\x00{document_id}"
+        return hashlib.sha256(raw.encode()).digest()
+
+    @staticmethod
+    def _embedding_cache_key(text: str) -> bytes:
+        """
+        Build the embedding cache key from the chunk text and the deployment
+        that embeds it.
+        """
+        raw = f"{settings.azure_openai_embedding_deployment}\x00{text}"
+        return hashlib.sha256(raw.encode()).digest()
+
+    def _clear_search_cache(self) -> None:
+        """
+        Drop cached search results after the index content changed.
+        """
+        if self.search_cache is not None:
+            self.search_cache.clear()
+        if self.semantic_cache is not None:
+            self.semantic_cache.clear()
+
+    async def close(self) -> None:
+        """
+        Close the async Azure Search client held by the vector store.
+        """
+        await self.vector_store.async_client.close()
@@ -1,3 +1,5 @@
+from types import MappingProxyType
+
 from api.exceptions import FileProcessingError
 
 from .parsers import BaseFileParser, DocxFileParser, PdfFileParser, TxtFileParser
@@ -13,20 +15,26 @@ class FileParserFactory:
         ".docx": DocxFileParser,
         ".pdf": PdfFileParser,
     }
+    # Parsers hold no state, so one instance per extension serves every upload.
+    # Built once at import and read-only afterwards
+    _parsers = MappingProxyType(
+        {ext: parser_cls() for ext, parser_cls in parser_map.items()}
+    )
 
     @classmethod
     def get_parser(cls, filename: str) -> BaseFileParser:
         """
-        Return an instance of the parser matching the file's extension.
+        Return the parser matching the file's extension (case-insensitive).
 
         Args:
             filename (str): Name of the uploaded file
 
         Returns:
-            BaseFileParser: Concrete parser instance
+            BaseFileParser: Shared concrete parser instance
         """
-        filename = filename.lower()
-        for ext, parser_cls in cls.parser_map.items():
-            if filename.endswith(ext):
-                return parser_cls()
-        raise FileProcessingError(f"Unsupported file type: {filename}")
+        # Only the extension is lowercased. Without a dot, rfind returns -1 and
+        # the last character never matches an extension
+        parser = cls._parsers.get(filename[filename.rfind("."):].lower())
+        if parser is None:
+            raise FileProcessingError(f"Unsupported file type: {filename}")
+        return parser
@@ -1,3 +1,5 @@
+from typing import Iterator
+
 from fastapi import UploadFile
 
 from api.exceptions import FileProcessingError
@@ -36,3 +38,25 @@ class FileReader:
         except Exception as e:
             # Wrap unexpected errors in a consistent project-specific exception
             raise FileProcessingError(f"Failed to read file {file.filename}: {str(e)}")
+
+    def iter_text(self, file: UploadFile) -> Iterator[str]:
+        """
+        Streams the extracted text content in blocks instead of returning it
+        as a single string, so large uploads can be chunked incrementally.
+
+        Args:
+            file (UploadFile): File uploaded via FastAPI
+
+        Yields:
+            str: Consecutive blocks of the extracted textual content
+
+        Raises:
+            FileProcessingError: If the file type is unsupported or parsing fails
+        """
+        try:
+            parser = FileParserFactory.get_parser(file.filename)
+            yield from parser.iter_text(file)
+        except FileProcessingError:
+            raise
+        except Exception as e:
+            raise FileProcessingError(f"Failed to read file {file.filename}: {str(e)}")
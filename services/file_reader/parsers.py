@@ -1,11 +1,59 @@
+import codecs
+import io
+import multiprocessing
+import os
 from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Iterator, List, Optional
 
 import docx
-import PyPDF2
 from fastapi import UploadFile
+from pypdf import PdfReader
 
 from api.exceptions import FileProcessingError
 
+READ_BLOCK_SIZE = 64 * 1024  # 64 KB
+
+# PDFs with at least this many pages have their text extracted in parallel
+PDF_PARALLEL_MIN_PAGES = 20
+PDF_MAX_WORKERS = os.cpu_count() or 1
+
+_pdf_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pdf_executor() -> ProcessPoolExecutor:
+    """
+    Process pool for PDF text extraction, created on first use. Workers are
+    spawned rather than forked, forking a process running an event loop and
+    client threads is not safe.
+    """
+    global _pdf_executor
+    if _pdf_executor is None:
+        _pdf_executor = ProcessPoolExecutor(
+            max_workers=PDF_MAX_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pdf_executor
+
+
+def shutdown_pdf_executor() -> None:
+    """
+    Stop the PDF worker processes, if any were started.
+    """
+    global _pdf_executor
+    if _pdf_executor is not None:
+        _pdf_executor.shutdown(cancel_futures=True)
+        _pdf_executor = None
+
+
+def _extract_pdf_pages(data: bytes, start: int, stop: int) -> List[str]:
+    """
+    Extract the text of pages [start, stop) of a PDF. Runs in a worker process.
+    """
+    reader = PdfReader(io.BytesIO(data))
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
 
 class BaseFileParser(ABC):
     """
@@ -27,15 +75,36 @@ class BaseFileParser(ABC):
         """
         pass
 
+    def iter_text(self, file: UploadFile) -> Iterator[str]:
+        """
+        Yields the text content of the given file in blocks.
+
+        Formats that can only be parsed as a whole yield a single block;
+        parsers that can decode incrementally override this.
+
+        Args:
+            file (UploadFile): File uploaded via FastAPI
+
+        Yields:
+            str: Consecutive blocks of the file's text content
+        """
+        yield self.parse(file)
+
 
 class TxtFileParser(BaseFileParser):
     """Parser for plain text (.txt) files."""
 
     def parse(self, file: UploadFile) -> str:
+        return "".join(self.iter_text(file))
+
+    def iter_text(self, file: UploadFile) -> Iterator[str]:
+        # Decode block by block so the raw bytes and the decoded text of the
+        # whole file are never held in memory at the same time
         try:
-            content = file.file.read().decode("utf-8")
-            file.file.seek(0)  # Reset file pointer for potential further use
-            return content
+            decoder = codecs.getincrementaldecoder("utf-8")()
+            while block := file.file.read(READ_BLOCK_SIZE):
+                yield decoder.decode(block)
+            yield decoder.decode(b"", final=True)
         except Exception as e:
             raise FileProcessingError(f"Failed to parse TXT file: {str(e)}")
 
@@ -46,9 +115,7 @@ class DocxFileParser(BaseFileParser):
     def parse(self, file: UploadFile) -> str:
         try:
             doc = docx.Document(file.file)
-            content = "\n".join([p.text for p in doc.paragraphs])
-            file.file.seek(0)
-            return content
+            return "\n".join(p.text for p in doc.paragraphs)
         except Exception as e:
             raise FileProcessingError(f"Failed to parse DOCX file: {str(e)}")
 
@@ -57,10 +124,38 @@ class PdfFileParser(BaseFileParser):
     """Parser for PDF files."""
 
     def parse(self, file: UploadFile) -> str:
+        return "".join(self.iter_text(file))
+
+    def iter_text(self, file: UploadFile) -> Iterator[str]:
+        # Yield page by page so the text of the whole document is never held
+        # in memory at once, pages are separated by a newline
         try:
-            reader = PyPDF2.PdfReader(file.file)
-            content = "\n".join([page.extract_text() or "" for page in reader.pages])
-            file.file.seek(0)
-            return content
+            reader = PdfReader(file.file)
+            page_count = len(reader.pages)
+            if page_count >= PDF_PARALLEL_MIN_PAGES and PDF_MAX_WORKERS > 1:
+                pages = self._iter_pages_parallel(file, page_count)
+            else:
+                pages = (page.extract_text() or "" for page in reader.pages)
+            for i, text in enumerate(pages):
+                if i:
+                    yield "\n"
+                yield text
         except Exception as e:
             raise FileProcessingError(f"Failed to parse PDF file: {str(e)}")
+
+    @staticmethod
+    def _iter_pages_parallel(file: UploadFile, page_count: int) -> Iterator[str]:
+        """
+        Extract page text across the worker processes. Text extraction is
+        CPU-bound, so large PDFs are split into one contiguous page range per
+        worker. Each worker gets the raw bytes once and parses only its range.
+        """
+        # PdfReader moved the position while indexing the pages
+        file.file.seek(0)
+        data = file.file.read()
+        step = -(-page_count // PDF_MAX_WORKERS)  # ceil division
+        starts = range(0, page_count, step)
+        stops = [min(start + step, page_count) for start in starts]
+        # map returns the ranges in order, so pages keep their order
+        for texts in _get_pdf_executor().map(_extract_pdf_pages, repeat(data), starts, stops):
+            yield from texts
@@ -1,7 +1,11 @@
-from azure.identity import DefaultAzureCredential
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
 from azure.keyvault.secrets import SecretClient
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from services.credential import get_credential
+
 
 class Settings(BaseSettings):
     # Key Vault configuration
@@ -12,9 +16,14 @@ class Settings(BaseSettings):
     azure_openai_embedding_deployment: str
     azure_openai_embedding_model: str
     azure_openai_embedding_api_version: str
+    embedding_batch_size: int = 16
+    embedding_max_concurrency: int = 10
+    embedding_cache_size: int = 4096
     azure_openai_chat_deployment: str
     azure_openai_chat_model: str
     azure_openai_chat_api_version: str
+    chat_max_history_messages: int = 8
+    azure_openai_max_retries: int = 3
 
     # Cosmos DB
     cosmos_db_uri: str
@@ -24,6 +33,11 @@ class Settings(BaseSettings):
     # Azure Search
     azure_search_endpoint: str
     azure_search_index: str
+    azure_search_semantic_configuration: Optional[str] = None
+    vector_search_cache_size: int = 1024
+    vector_search_cache_ttl_seconds: int = 60
+    vector_search_semantic_cache_size: int = 0
+    vector_search_semantic_cache_threshold: float = 0.95
 
     # Auth settings
     username: str = ""
@@ -31,20 +45,27 @@ class Settings(BaseSettings):
     secret_key: str = ""
     auth_algorithm: str = "HS256"
     access_token_expire_minutes: int = 60
+    # How long a verified token is cached in memory, 0 disables the cache
+    auth_token_cache_ttl_seconds: int = 30
+
+    # CORS
+    cors_allow_origins: List[str] = []
+    cors_allow_origin_regex: Optional[str] = None
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
     def load_secrets_from_key_vault(self):
         """
-        Load sensitive credentials from Azure Key Vault using DefaultAzureCredential.
+        Load sensitive credentials from Azure Key Vault using the shared credential.
         """
         try:
-            credential = DefaultAzureCredential()
-            client = SecretClient(vault_url=self.key_vault_url, credential=credential)
+            client = SecretClient(vault_url=self.key_vault_url, credential=get_credential())
 
-            self.secret_key = client.get_secret("auth-jwt-secret").value
-            self.username = client.get_secret("auth-app-username").value
-            self.password = client.get_secret("auth-app-password").value
+            # Fetch the secrets concurrently instead of three round-trips in a row
+            names = ("auth-jwt-secret", "auth-app-username", "auth-app-password")
+            with ThreadPoolExecutor(max_workers=len(names)) as pool:
+                secrets = list(pool.map(client.get_secret, names))
+            self.secret_key, self.username, self.password = (s.value for s in secrets)
 
             # Optional: ensure none of the secrets are empty
             if not all([self.secret_key, self.username, self.password]):